@@ -7,9 +7,13 @@ Shows tables, their row counts, and basic structure.
 import os
 import sys
 import psycopg2
-import psycopg2.extras
 from src.config import Config
 
+# Add src to path for the database module
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from database import connection_kwargs
+
 # Load environment variables from local config file if it exists
 def load_local_env():
     """Load environment variables from local_config.env if it exists."""
@@ -60,14 +64,8 @@ def check_database_state():
     
     # Connect to database
     try:
-        conn = psycopg2.connect(
-            host=config.db_host,
-            port=config.db_port,
-            database=config.db_name,
-            user=config.db_user,
-            password=config.db_password,
-            cursor_factory=psycopg2.extras.RealDictCursor
-        )
+        # Same SSL, keepalive and cursor settings as the ingestion pools
+        conn = psycopg2.connect(**connection_kwargs(config))
         
         with conn.cursor() as cursor:
             print("✅ Database connection successful!")
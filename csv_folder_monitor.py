@@ -7,9 +7,58 @@ Monitors the 'Fullbay Employee Statistics' folder for new CSV files and processe
 import os
 import sys
 import time
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from csv_schema_detector import CSVSchemaDetector
 
+# Files loaded concurrently; loading is bound by disk and database round-trips
+MAX_WORKERS = 4
+
+# Consecutive polls a new file's size must stay unchanged before it is processed
+STABLE_POLLS = 2
+
+# One detector (and database connection pool) per worker thread, reused across files
+_worker_state = threading.local()
+_worker_detectors = []
+_worker_detectors_lock = threading.Lock()
+
+def _get_detector() -> CSVSchemaDetector:
+    """Get the calling worker thread's detector, creating it on first use."""
+    detector = getattr(_worker_state, 'detector', None)
+    if detector is None:
+        detector = CSVSchemaDetector()
+        _worker_state.detector = detector
+        with _worker_detectors_lock:
+            _worker_detectors.append(detector)
+    return detector
+
+def _close_detectors():
+    """Close every worker detector's database connections."""
+    with _worker_detectors_lock:
+        for detector in _worker_detectors:
+            detector.close()
+        _worker_detectors.clear()
+
+def _process_one(file_path: str):
+    """Process a single CSV file on a worker thread."""
+    file_name = os.path.basename(file_path)
+    try:
+        # Prompts would interleave across workers, so monitored files are loaded unattended
+        success = _get_detector().process_csv_file(file_path, auto_confirm=True)
+        if success:
+            print(f"✅ Successfully processed: {file_name}")
+        else:
+            print(f"❌ Failed to process: {file_name}")
+    except Exception as e:
+        print(f"❌ Error processing {file_name}: {e}")
+
+def _changed_at(entry: os.DirEntry) -> float:
+    """Latest modification or status-change time of a directory entry."""
+    stat = entry.stat()
+    return max(stat.st_mtime, stat.st_ctime)
+
 def monitor_folder(folder_path: str):
     """Monitor a folder for new CSV files."""
     print(f"👀 Monitoring folder: {folder_path}")
@@ -17,38 +66,65 @@ def monitor_folder(folder_path: str):
     print("⏹️  Press Ctrl+C to stop monitoring")
     print("=" * 60)
     
-    # Get initial list of files
-    initial_files = set()
+    # Files present before monitoring started are ignored
+    last_seen = 0.0
+    seen_paths = set()
     if os.path.exists(folder_path):
-        initial_files = set(os.listdir(folder_path))
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                last_seen = max(last_seen, _changed_at(entry))
+                seen_paths.add(entry.path)
+    
+    pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    atexit.register(_close_detectors)
+    in_flight = {}
+    # New files still being written: path -> (size at last poll, polls the size has been unchanged)
+    pending = {}
     
     try:
         while True:
-            # Check for new files
+            # Forget files whose processing has finished
+            in_flight = {path: future for path, future in in_flight.items() if not future.done()}
+            
+            # Hand files to the worker pool once their size has settled
+            for path, (last_size, stable_count) in list(pending.items()):
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    del pending[path]  # Removed or renamed before it settled
+                    continue
+                stable_count = stable_count + 1 if size == last_size else 0
+                if stable_count < STABLE_POLLS:
+                    pending[path] = (size, stable_count)
+                    continue
+                del pending[path]
+                in_flight[path] = pool.submit(_process_one, path)
+            
+            # Check for new files: a name not in the folder at the last poll, or anything changed
+            # since the newest file seen so far. The name check catches files that keep old
+            # timestamps (a move within a Windows volume keeps both creation time and mtime)
             if os.path.exists(folder_path):
-                current_files = set(os.listdir(folder_path))
-                new_files = current_files - initial_files
-                
-                # Process new CSV files
-                for file_name in new_files:
-                    if file_name.lower().endswith('.csv'):
-                        file_path = os.path.join(folder_path, file_name)
-                        print(f"\n🆕 New CSV file detected: {file_name}")
+                newest = last_seen
+                current_paths = set()
+                with os.scandir(folder_path) as entries:
+                    for entry in entries:
+                        if not entry.name.lower().endswith('.csv') or not entry.is_file():
+                            continue
+                        current_paths.add(entry.path)
+                        changed = _changed_at(entry)
+                        newest = max(newest, changed)
+                        if entry.path in seen_paths and changed <= last_seen:
+                            continue
                         
-                        # Process the file
-                        detector = CSVSchemaDetector()
-                        try:
-                            success = detector.process_csv_file(file_path)
-                            if success:
-                                print(f"✅ Successfully processed: {file_name}")
-                            else:
-                                print(f"❌ Failed to process: {file_name}")
-                        except Exception as e:
-                            print(f"❌ Error processing {file_name}: {e}")
-                        finally:
-                            detector.close()
+                        # Wait for the writer to finish before processing
+                        if entry.path in in_flight or entry.path in pending:
+                            continue
+                        print(f"\n🆕 New CSV file detected: {entry.name}")
+                        pending[entry.path] = (entry.stat().st_size, 0)
                 
-                initial_files = current_files
+                last_seen = newest
+                # Forget removed files, so one dropped back in later counts as new
+                seen_paths = current_paths
             
             # Wait before checking again
             time.sleep(2)
@@ -57,6 +133,11 @@ def monitor_folder(folder_path: str):
         print("\n⏹️  Monitoring stopped by user")
     except Exception as e:
         print(f"❌ Error in monitoring: {e}")
+    finally:
+        running = sum(1 for future in in_flight.values() if not future.done())
+        if running:
+            print(f"⏳ Waiting for {running} file(s) still being processed...")
+        pool.shutdown(wait=True)
 
 def main():
     """Main function."""
@@ -4,13 +4,19 @@ CSV Schema Detector and Database Table Creator
 Automatically detects CSV schema and creates corresponding database tables.
 """
 
+import io
 import os
 import sys
+import json
+import hashlib
+import sqlite3
+from contextlib import closing
+import numpy as np
 import pandas as pd
 import psycopg2
 import psycopg2.extras
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import re
 
 # Add src to path
@@ -23,6 +29,62 @@ except ImportError as e:
     print(f"Import error: {e}")
     sys.exit(1)
 
+# Local cache of inferred schemas, keyed by a hash of the CSV header
+SCHEMA_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_schema_cache.sqlite')
+
+# Rows read from each CSV for schema inference
+SCHEMA_SAMPLE_ROWS = 10_000
+
+# Date strings: YYYY-MM-DD, MM/DD/YYYY or MM-DD-YYYY
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4}')
+
+# Fractional digits of a formatted number
+_FRACTION_RE = re.compile(r'\.(\d+)')
+
+# Column name cleanup for database identifiers
+_CLEAN_NAME_RE = re.compile(r'[^a-zA-Z0-9_]')
+_UNDERSCORE_RE = re.compile(r'_+')
+
+# Common indicators of totals/summary rows
+_TOTALS_RE = re.compile(
+    r'\b(?:total|totals|summary|grand total|subtotal|totaal|summe|gesamt|total general)\b',
+    re.IGNORECASE
+)
+
+def _clean_col(name: str) -> str:
+    """Turn a CSV header into a database column name."""
+    return _UNDERSCORE_RE.sub('_', _CLEAN_NAME_RE.sub('_', name.lower())).strip('_')
+
+def _varchar_length(max_length: int) -> int:
+    """VARCHAR size for a column: 2x headroom capped at 255, but never shorter than the longest value."""
+    return max(min(max(max_length, 1) * 2, 255), max_length)
+
+def _integral_floats_to_int(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn float columns holding only whole numbers back into nullable integers.
+    
+    pandas reads an integer column with blanks as float64, which to_csv writes as "3.0" -
+    text that COPY rejects for an INTEGER column.
+    """
+    converted = {}
+    for column in df.select_dtypes(include='float').columns:
+        values = df[column].dropna()
+        if len(values) and (values % 1 == 0).all() and values.abs().max() < 2 ** 63:
+            converted[column] = df[column].astype('Int64')
+    return df.assign(**converted) if converted else df
+
+def _pg_to_pandas(data_type: str) -> Optional[str]:
+    """Map a detected PostgreSQL type to the pandas dtype used when reading the column."""
+    if data_type == 'INTEGER':
+        return 'Int64'
+    if data_type.startswith(('DECIMAL', 'NUMERIC')):
+        return 'float64'
+    if data_type == 'BOOLEAN':
+        return 'boolean'
+    if data_type.startswith('VARCHAR'):
+        return 'string'
+    return None
+
 class CSVSchemaDetector:
     """Detects CSV schema and creates database tables."""
     
@@ -31,6 +93,8 @@ class CSVSchemaDetector:
         self.config = Config()
         self.db_manager = DatabaseManager(self.config)
         self.db_manager.connect()
+        # Tables whose file_name/loaded_at indexes have been ensured by this detector
+        self._indexed_tables = set()
         
     def detect_csv_schema(self, csv_file_path: str) -> Dict[str, Any]:
         """
@@ -45,22 +109,40 @@ class CSVSchemaDetector:
         print(f"🔍 Analyzing CSV file: {csv_file_path}")
         
         try:
-            # Read the CSV file
-            df = pd.read_csv(csv_file_path)
+            # Same file analyzed before (e.g. --schema-only, then a load)? Reuse its schema
+            header = pd.read_csv(csv_file_path, nrows=0).columns.tolist()
+            cache_key = self._cache_key(csv_file_path, header)
+            cached_schema = self._load_cached_schema(cache_key)
+            if cached_schema:
+                print("⚡ File unchanged since it was last analyzed - using cached schema")
+                cached_schema.update({
+                    'file_path': csv_file_path,
+                    'file_name': os.path.basename(csv_file_path)
+                })
+                return cached_schema
             
-            # Check if last row appears to be a totals row and remove it
-            original_row_count = len(df)
-            df = self._remove_totals_row(df)
-            rows_removed = original_row_count - len(df)
+            # Read a bounded sample - enough rows for type inference
+            df = pd.read_csv(csv_file_path, nrows=SCHEMA_SAMPLE_ROWS)
             
-            if rows_removed > 0:
-                print(f"⚠️  Detected and removed {rows_removed} totals/summary row(s)")
+            if len(df) < SCHEMA_SAMPLE_ROWS:
+                # Whole file fits in the sample: check if last row appears to be a totals row and remove it
+                original_row_count = len(df)
+                df = self._remove_totals_row(df)
+                rows_removed = original_row_count - len(df)
+                
+                if rows_removed > 0:
+                    print(f"⚠️  Detected and removed {rows_removed} totals/summary row(s)")
+                row_count = len(df)
+            else:
+                # Row counts (and totals rows, which sit past the sample) come from the full-file pass below
+                print(f"📏 Large file - inferring schema from the first {SCHEMA_SAMPLE_ROWS:,} rows")
+                original_row_count = row_count = rows_removed = 0
             
             schema_info = {
                 'file_path': csv_file_path,
                 'file_name': os.path.basename(csv_file_path),
                 'table_name': self._generate_table_name(csv_file_path),
-                'row_count': len(df),
+                'row_count': row_count,
                 'original_row_count': original_row_count,
                 'totals_rows_removed': rows_removed,
                 'column_count': len(df.columns),
@@ -72,12 +154,134 @@ class CSVSchemaDetector:
                 column_info = self._analyze_column(df, column)
                 schema_info['columns'].append(column_info)
             
+            if len(df) >= SCHEMA_SAMPLE_ROWS:
+                original_row_count, rows_removed = self._measure_full_file(csv_file_path, schema_info['columns'])
+                if rows_removed > 0:
+                    print(f"⚠️  Detected {rows_removed} totals/summary row(s) - the loader removes them")
+                schema_info.update({
+                    'row_count': original_row_count - rows_removed,
+                    'original_row_count': original_row_count,
+                    'totals_rows_removed': rows_removed
+                })
+            
+            self._store_cached_schema(cache_key, schema_info)
+            
+            # The sample is the whole file - keep it so loading doesn't parse the CSV again
+            if len(df) + rows_removed < SCHEMA_SAMPLE_ROWS:
+                schema_info['_df'] = df
             return schema_info
             
         except Exception as e:
             print(f"❌ Error analyzing CSV: {e}")
             return None
     
+    def _measure_full_file(self, csv_file_path: str, columns: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Size VARCHAR/NUMERIC columns (and nullability) over the whole file.
+        
+        Rows past the sample can hold longer or larger values, or blanks, that COPY would
+        reject under sizes taken from the sample alone. The file is read in chunks as text.
+        
+        Returns:
+            Tuple of (data rows in the file, trailing totals rows)
+        """
+        sized = {column['original_name']: column for column in columns
+                 if column['data_type'] == 'VARCHAR' or column['data_type'].startswith('NUMERIC')}
+        by_name = {column['original_name']: column for column in columns}
+        max_lengths = dict.fromkeys(sized, 0)
+        # Per still-numeric column: the largest-magnitude and most-decimals value of each chunk
+        numeric_extremes = {name: [] for name, column in sized.items() if column['data_type'] != 'VARCHAR'}
+        
+        def measure(chunk: pd.DataFrame):
+            for name, has_nulls in chunk.isna().any().items():
+                if has_nulls and name in by_name:
+                    by_name[name]['nullable'] = True
+            for name in sized:
+                values = chunk[name].dropna()
+                if values.empty:
+                    continue
+                max_lengths[name] = max(max_lengths[name], int(values.str.len().max()))
+                if name not in numeric_extremes:
+                    continue
+                numbers = pd.to_numeric(values, errors='coerce')
+                if numbers.isna().any():
+                    # Text further down the file: not a numeric column after all
+                    del numeric_extremes[name]
+                    continue
+                numbers = numbers[np.isfinite(numbers)]
+                if len(numbers):
+                    decimals = values[numbers.index].str.extract(_FRACTION_RE, expand=False).str.len()
+                    numeric_extremes[name] += [numbers.abs().max(), numbers[decimals.fillna(0).idxmax()]]
+        
+        # Totals rows sit at the end of the file, so the last chunk is measured after removing them
+        previous = None
+        total_rows = rows_removed = 0
+        for chunk in pd.read_csv(csv_file_path, dtype=str, chunksize=SCHEMA_SAMPLE_ROWS):
+            total_rows += len(chunk)
+            if previous is not None:
+                measure(previous)
+            previous = chunk
+        if previous is not None:
+            last_chunk = self._remove_totals_row(previous)
+            rows_removed = len(previous) - len(last_chunk)
+            measure(last_chunk)
+        
+        for name, column in sized.items():
+            if name in numeric_extremes:
+                column['data_type'] = self._numeric_type(pd.Series(numeric_extremes[name], dtype=float))
+            else:
+                column['data_type'] = 'VARCHAR'
+                column['max_length'] = max_lengths[name]
+                column['suggested_length'] = _varchar_length(max_lengths[name])
+        
+        return total_rows, rows_removed
+    
+    def _cache_key(self, csv_file_path: str, columns: List[str]) -> str:
+        """
+        Hash the column names with the file's size and modification time.
+        
+        Sizes, nullability and row counts describe one file's contents, so a new export with
+        the same header (or the same file rewritten) must not reuse them.
+        """
+        stat = os.stat(csv_file_path)
+        key = '\x1f'.join(sorted(columns)) + f'\x1e{stat.st_size}:{stat.st_mtime_ns}'
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    def _open_schema_cache(self) -> sqlite3.Connection:
+        """Open the local schema cache, creating it on first use."""
+        cache = sqlite3.connect(SCHEMA_CACHE_PATH)
+        # schema_file_cache replaces the old header-only schema_cache table, whose entries are ignored
+        cache.execute("CREATE TABLE IF NOT EXISTS schema_file_cache (cache_key TEXT PRIMARY KEY, schema_json TEXT)")
+        return cache
+    
+    def _load_cached_schema(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached schema for a cache key, or None on a miss."""
+        try:
+            with closing(self._open_schema_cache()) as cache:
+                row = cache.execute(
+                    "SELECT schema_json FROM schema_file_cache WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️  Could not read schema cache: {e}")
+            return None
+    
+    def _store_cached_schema(self, cache_key: str, schema_info: Dict[str, Any]):
+        """Store a detected schema, minus the path-specific fields filled in on lookup."""
+        cached = {key: value for key, value in schema_info.items()
+                  if key not in ('file_path', 'file_name', '_df')}
+        try:
+            # numpy scalars (counts, lengths, flags) are converted to plain Python values
+            schema_json = json.dumps(cached, default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+            # closing() closes the handle; sqlite3's own context manager only commits
+            with closing(self._open_schema_cache()) as cache, cache:
+                cache.execute(
+                    "INSERT OR REPLACE INTO schema_file_cache (cache_key, schema_json) VALUES (?, ?)",
+                    (cache_key, schema_json)
+                )
+        except (sqlite3.Error, TypeError) as e:
+            print(f"⚠️  Could not update schema cache: {e}")
+    
     def _remove_totals_row(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Detect and remove totals/summary rows from the end of the DataFrame.
@@ -91,36 +295,19 @@ class CSVSchemaDetector:
         if len(df) == 0:
             return df
         
-        # Common indicators of totals rows
-        totals_indicators = [
-            'total', 'totals', 'summary', 'grand total', 'subtotal',
-            'totaal', 'summe', 'gesamt', 'total general'
-        ]
+        # Check the last few rows (or all if fewer than 3) for totals indicators
+        tail = df.tail(3).astype(str)
+        hits = tail.apply(lambda col: col.str.contains(_TOTALS_RE, na=False))
+        hit_rows = hits.any(axis=1).to_numpy().nonzero()[0]
         
-        # Check the last few rows for totals indicators
-        rows_to_check = min(3, len(df))  # Check last 3 rows or all if less than 3
-        
-        for i in range(rows_to_check):
-            row_index = len(df) - 1 - i
-            row = df.iloc[row_index]
-            
-            # Check if any cell in the row contains totals indicators
-            for col in df.columns:
-                cell_value = str(row[col]).lower().strip()
-                
-                # Check for exact matches or partial matches
-                for indicator in totals_indicators:
-                    if indicator in cell_value:
-                        print(f"🔍 Found totals indicator '{indicator}' in row {row_index + 1}, column '{col}'")
-                        # Remove this row and all rows after it
-                        df = df.iloc[:row_index]
-                        break
-                else:
-                    continue
-                break
-            else:
-                continue
-            break
+        if len(hit_rows) > 0:
+            # Bottom-most matching row: remove it and all rows after it
+            position = hit_rows[-1]
+            row_index = len(df) - len(tail) + position
+            col = hits.columns[hits.iloc[position].to_numpy().argmax()]
+            indicator = _TOTALS_RE.search(tail.iloc[position][col]).group(0).lower()
+            print(f"🔍 Found totals indicator '{indicator}' in row {row_index + 1}, column '{col}'")
+            df = df.iloc[:row_index]
         
         return df
     
@@ -134,8 +321,7 @@ class CSVSchemaDetector:
         series = df[column_name]
         
         # Clean column name for database
-        clean_name = re.sub(r'[^a-zA-Z0-9_]', '_', column_name.lower())
-        clean_name = re.sub(r'_+', '_', clean_name).strip('_')
+        clean_name = _clean_col(column_name)
         
         column_info = {
             'original_name': column_name,
@@ -148,47 +334,58 @@ class CSVSchemaDetector:
         
         # Add specific type information
         if column_info['data_type'] == 'VARCHAR':
-            max_length = series.astype(str).str.len().max()
+            # Single pass over the non-null values, no intermediate string/length Series
+            values = series.dropna().to_numpy(dtype=object)
+            max_length = max((len(v) if isinstance(v, str) else len(str(v)) for v in values), default=0)
             column_info['max_length'] = max_length
-            column_info['suggested_length'] = min(max_length * 2, 255)  # Add some buffer
+            column_info['suggested_length'] = _varchar_length(max_length)
         
         return column_info
     
     def _determine_data_type(self, series: pd.Series) -> str:
         """Determine the appropriate PostgreSQL data type for a pandas Series."""
+        # Check for boolean (before numeric - pandas treats bool as numeric)
+        if pd.api.types.is_bool_dtype(series):
+            return 'BOOLEAN'
+        
         # Check for numeric types
         if pd.api.types.is_numeric_dtype(series):
             if pd.api.types.is_integer_dtype(series):
                 return 'INTEGER'
             else:
-                return 'DECIMAL(10,2)'
+                return self._numeric_type(series)
         
         # Check for datetime
         if pd.api.types.is_datetime64_any_dtype(series):
             return 'TIMESTAMP'
         
-        # Check for boolean
-        if pd.api.types.is_bool_dtype(series):
-            return 'BOOLEAN'
-        
         # Check for date strings
         if series.dtype == 'object':
             # Try to detect date patterns
             sample_values = series.dropna().head(10)
             if len(sample_values) > 0:
-                date_patterns = [
-                    r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-                    r'\d{2}/\d{2}/\d{4}',  # MM/DD/YYYY
-                    r'\d{2}-\d{2}-\d{4}',  # MM-DD-YYYY
-                ]
-                
-                for pattern in date_patterns:
-                    if sample_values.astype(str).str.match(pattern).any():
-                        return 'DATE'
+                if sample_values.astype(str).str.match(_DATE_RE).any():
+                    return 'DATE'
         
         # Default to VARCHAR
         return 'VARCHAR'
     
+    def _numeric_type(self, series: pd.Series) -> str:
+        """Size NUMERIC(precision, scale) from the values present so large values don't overflow."""
+        values = series.dropna()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return 'DECIMAL(10,2)'
+        
+        largest = float(values.abs().max())
+        int_digits = int(np.log10(largest)) + 1 if largest >= 1 else 1
+        scale = values.astype(str).str.extract(_FRACTION_RE, expand=False).str.len().max()
+        # Keep at least the 2 decimals the old DECIMAL(10,2) default allowed
+        scale = max(int(scale) if pd.notna(scale) else 0, 2)
+        # 2 spare integer digits for larger values outside the inference sample, never fewer than DECIMAL(10,2)
+        int_digits = max(int_digits + 2, 8)
+        return f'NUMERIC({int_digits + scale},{scale})'
+    
     def generate_create_table_sql(self, schema_info: Dict[str, Any]) -> str:
         """Generate CREATE TABLE SQL from schema information."""
         table_name = schema_info['table_name']
@@ -215,8 +412,29 @@ class CSVSchemaDetector:
         sql_parts.append("    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
         sql_parts.append(");")
         
+        sql_parts.append(self._file_index_sql(table_name))
+        
         return "\n".join(sql_parts)
     
+    def _file_index_sql(self, table_name: str) -> str:
+        """Indexes for the per-file duplicate check and load history."""
+        return (f"CREATE INDEX IF NOT EXISTS idx_{table_name}_file_name ON {table_name}(file_name);\n"
+                f"CREATE INDEX IF NOT EXISTS idx_{table_name}_loaded_at ON {table_name}(loaded_at DESC);")
+    
+    def _ensure_file_indexes(self, table_name: str):
+        """Add the file indexes to a table created before they existed (once per table)."""
+        if table_name in self._indexed_tables:
+            return
+        try:
+            with self.db_manager._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(self._file_index_sql(table_name))
+                    conn.commit()
+            self._indexed_tables.add(table_name)
+        except Exception as e:
+            # e.g. another monitor worker creating the same index at the same moment
+            print(f"⚠️  Could not create file indexes on '{table_name}': {e}")
+    
     def create_table_from_schema(self, schema_info: Dict[str, Any]) -> bool:
         """Create a database table from the schema information."""
         try:
@@ -241,14 +459,15 @@ class CSVSchemaDetector:
             
             with self.db_manager._get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE file_name = %s", (file_name,))
+                    cursor.execute(
+                        f"SELECT COUNT(*) AS row_count, MAX(loaded_at) AS last_loaded FROM {table_name} WHERE file_name = %s",
+                        (file_name,)
+                    )
                     result = cursor.fetchone()
-                    count = result[0] if result else 0
+                    count = result['row_count'] if result else 0
                     
                     if count > 0:
-                        cursor.execute(f"SELECT loaded_at FROM {table_name} WHERE file_name = %s ORDER BY loaded_at DESC LIMIT 1", (file_name,))
-                        result = cursor.fetchone()
-                        last_loaded = result[0] if result else 'Unknown'
+                        last_loaded = result['last_loaded'] or 'Unknown'
                         print(f"⚠️  File '{file_name}' already loaded on {last_loaded}")
                         print(f"📊 Found {count:,} existing records from this file")
                         return True
@@ -259,21 +478,58 @@ class CSVSchemaDetector:
             print(f"⚠️  Could not check for existing data: {e}")
             return False
     
-    def load_csv_to_table(self, csv_file_path: str, table_name: str, skip_duplicates: bool = True) -> bool:
+    def _read_csv_typed(self, csv_file_path: str, schema_info: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Read a CSV with the detected column types instead of letting pandas infer them."""
+        if schema_info is None:
+            header = pd.read_csv(csv_file_path, nrows=0).columns.tolist()
+            schema_info = self._load_cached_schema(self._cache_key(csv_file_path, header))
+        if not schema_info:
+            return pd.read_csv(csv_file_path)
+        
+        dtypes = {}
+        date_columns = []
+        for column in schema_info['columns']:
+            if column['data_type'] in ('DATE', 'TIMESTAMP'):
+                date_columns.append(column['original_name'])
+            else:
+                pd_dtype = _pg_to_pandas(column['data_type'])
+                if pd_dtype:
+                    dtypes[column['original_name']] = pd_dtype
+        
+        try:
+            return pd.read_csv(csv_file_path, dtype=dtypes, parse_dates=date_columns, engine='c', low_memory=False)
+        except (ValueError, TypeError) as e:
+            print(f"⚠️  Data does not match the detected column types ({e}) - falling back to type inference")
+            return pd.read_csv(csv_file_path)
+    
+    def _confirm_load(self, csv_file_path: str, table_name: str, skip_duplicates: bool, interactive: bool) -> bool:
+        """Return False if the file is already loaded and the user (or non-interactive mode) declines a reload."""
+        # The table usually already exists (process_csv_file never creates it), so index it here
+        self._ensure_file_indexes(table_name)
+        if not skip_duplicates or not self.check_file_already_loaded(csv_file_path, table_name):
+            return True
+        if not interactive:
+            print("⏭️  Skipping - file already loaded")
+            return False
+        response = input("❓ File already exists. Do you want to load it again anyway? (y/n): ")
+        if response.lower() != 'y':
+            print("❌ Loading cancelled - file already exists")
+            return False
+        print("⚠️  Proceeding with duplicate data...")
+        return True
+    
+    def load_csv_to_table(self, csv_file_path: str, table_name: str, skip_duplicates: bool = True,
+                          interactive: bool = True, schema_info: Optional[Dict[str, Any]] = None) -> bool:
         """Load CSV data into the database table."""
         try:
             print(f"📥 Loading CSV data into table '{table_name}'...")
             
             # Check if file already loaded
-            if skip_duplicates and self.check_file_already_loaded(csv_file_path, table_name):
-                response = input("❓ File already exists. Do you want to load it again anyway? (y/n): ")
-                if response.lower() != 'y':
-                    print("❌ Loading cancelled - file already exists")
-                    return False
-                print("⚠️  Proceeding with duplicate data...")
+            if not self._confirm_load(csv_file_path, table_name, skip_duplicates, interactive):
+                return False
             
             # Read CSV
-            df = pd.read_csv(csv_file_path)
+            df = self._read_csv_typed(csv_file_path, schema_info)
             
             # Remove totals rows (same logic as in schema detection)
             original_count = len(df)
@@ -281,23 +537,31 @@ class CSVSchemaDetector:
             if len(df) < original_count:
                 print(f"⚠️  Removed {original_count - len(df)} totals row(s) during data loading")
             
+        except Exception as e:
+            print(f"❌ Error loading CSV: {e}")
+            return False
+        
+        return self.load_dataframe_to_table(df, table_name, csv_file_path)
+    
+    def load_dataframe_to_table(self, df: pd.DataFrame, table_name: str, csv_file_path: str) -> bool:
+        """Load an already parsed (and totals-cleaned) CSV DataFrame into the database table."""
+        try:
             # Clean column names
-            df.columns = [re.sub(r'[^a-zA-Z0-9_]', '_', col.lower()) for col in df.columns]
-            df.columns = [re.sub(r'_+', '_', col).strip('_') for col in df.columns]
+            df.columns = [_clean_col(col) for col in df.columns]
             
             # Add metadata
             df['file_name'] = os.path.basename(csv_file_path)
             df['loaded_at'] = datetime.now()
             
-            # Convert to list of tuples for insertion
-            data_tuples = [tuple(row) for row in df.values]
+            # Serialize once for COPY; missing values become empty unquoted fields (NULL)
+            buffer = io.StringIO()
+            _integral_floats_to_int(df).to_csv(buffer, header=False, index=False)
+            buffer.seek(0)
             columns = ', '.join(df.columns)
-            placeholders = ', '.join(['%s'] * len(df.columns))
             
             with self.db_manager._get_connection() as conn:
                 with conn.cursor() as cursor:
-                    insert_sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-                    cursor.executemany(insert_sql, data_tuples)
+                    cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT CSV)", buffer)
                     conn.commit()
             
             print(f"✅ Loaded {len(df)} rows into table '{table_name}'")
@@ -328,8 +592,18 @@ class CSVSchemaDetector:
                 print("❌ Operation cancelled by user")
                 return False
         
-        # Step 4: Load data
-        if not self.load_csv_to_table(csv_file_path, schema_info['table_name']):
+        # Step 4: Load data (reuse the DataFrame parsed during detection when the whole file was read)
+        df = schema_info.pop('_df', None)
+        table_name = schema_info['table_name']
+        if df is not None:
+            print(f"📥 Loading CSV data into table '{table_name}'...")
+            if not self._confirm_load(csv_file_path, table_name, True, not auto_confirm):
+                return False
+            loaded = self.load_dataframe_to_table(df, table_name, csv_file_path)
+        else:
+            loaded = self.load_csv_to_table(csv_file_path, table_name, interactive=not auto_confirm,
+                                            schema_info=schema_info)
+        if not loaded:
             return False
         
         print(f"\n✅ Successfully processed {csv_file_path}")
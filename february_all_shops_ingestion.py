@@ -3,21 +3,29 @@
 February 2025 Multi-Shop Data Ingestion Script
 
 Ingests February 2025 data for all configured shops (DET, OKPK, WIX, BUS).
-Processes each shop sequentially with comprehensive logging and error handling.
+Processes shops concurrently with comprehensive logging and error handling.
 """
 
 import os
 import sys
 import logging
 import asyncio
+from collections import deque
+from itertools import islice
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
+from dataclasses import dataclass
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
 
 # Add src directory to path
 sys.path.append('src')
 
 from config import Config
-from database import DatabaseManager
+from database import DatabaseManager, create_shared_connection_pool
 from fullbay_client import FullbayClient
 from utils import setup_logging
 from multi_shop_config import MultiShopConfigManager
@@ -25,16 +33,37 @@ from multi_shop_config import MultiShopConfigManager
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shops ingested at the same time; each has its own API client and database pool
+MAX_CONCURRENT_SHOPS = 4
+
+# API requests in flight per shop while fetching the month's days
+MAX_CONCURRENT_DAY_FETCHES = 6
+
+# Days of invoices written per insert_records call (each call is one transaction)
+INSERT_BATCH_DAYS = 7
+
+@dataclass(slots=True)
+class DayResult:
+    """Outcome of ingesting a single day for a shop."""
+    date: date
+    invoice_count: int = 0
+    success: bool = True
+    error: Optional[str] = None
+
 def load_local_env():
     """Load environment variables from local_config.env."""
     env_file = "local_config.env"
     if os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+        # Variables already set in the environment take precedence over the file
+        if load_dotenv:
+            load_dotenv(env_file, override=False)
+        else:
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        os.environ.setdefault(key, value)
         logger.info("✅ Environment variables loaded from local config")
     else:
         logger.error("❌ local_config.env not found!")
@@ -46,7 +75,16 @@ def get_february_date_range() -> Tuple[date, date]:
     end_date = date(2025, 2, 28)  # February 2025 has 28 days
     return start_date, end_date
 
-async def ingest_shop_data(shop_id: str, shop_name: str, start_date: date, end_date: date) -> Dict[str, Any]:
+def open_shop_connections(shop_id: str, connection_pool=None) -> Tuple[FullbayClient, DatabaseManager]:
+    """Create the API client and a connected database manager for a shop."""
+    config = Config(shop_id=shop_id)
+    client = FullbayClient(config)
+    db_manager = DatabaseManager(config, connection_pool=connection_pool)
+    db_manager.connect()
+    return client, db_manager
+
+async def ingest_shop_data(shop_id: str, shop_name: str, start_date: date, end_date: date,
+                           connection_pool=None) -> Dict[str, Any]:
     """
     Ingest February data for a single shop.
     
@@ -55,6 +93,7 @@ async def ingest_shop_data(shop_id: str, shop_name: str, start_date: date, end_d
         shop_name: Human-readable shop name
         start_date: Start date for ingestion
         end_date: End date for ingestion
+        connection_pool: Optional database pool shared with the other shops
         
     Returns:
         Dictionary with ingestion results
@@ -77,78 +116,103 @@ async def ingest_shop_data(shop_id: str, shop_name: str, start_date: date, end_d
     }
     
     try:
-        # Initialize configuration and clients
-        config = Config(shop_id=shop_id)
-        client = FullbayClient(config)
-        db_manager = DatabaseManager(config)
-        
-        # Connect to database
-        db_manager.connect()
+        # Initialize configuration and clients, and connect to database
+        # (blocking calls run in worker threads so other shops keep going)
+        client, db_manager = await asyncio.to_thread(open_shop_connections, shop_id, connection_pool)
         logger.info(f"🔌 Connected to database and API for {shop_name}")
         
-        # Process each day in February
-        current_date = start_date
+        # Fetch several days of February concurrently - each day is an independent API call -
+        # and insert finished days while later ones are still being fetched
+        dates = [start_date + timedelta(days=offset) for offset in range(results['total_days'])]
+        
+        async def fetch_day(day: date) -> List[Dict[str, Any]]:
+            logger.info(f"📅 Fetching {day} for {shop_name}...")
+            target_datetime = datetime.combine(day, datetime.min.time())
+            return await asyncio.to_thread(client.fetch_invoices_for_date, target_datetime)
+        
+        # Bounded, so fetching pauses when inserts fall behind instead of holding the whole month in memory
+        fetched_days = asyncio.Queue(maxsize=INSERT_BATCH_DAYS * 2)
+        
+        async def produce():
+            """Queue each day's invoices (or fetch error) in date order, then a None sentinel."""
+            # A sliding window of fetches: the next day starts only once the oldest is queued
+            in_flight = deque()
+            remaining_days = iter(dates)
+            try:
+                for day in islice(remaining_days, MAX_CONCURRENT_DAY_FETCHES):
+                    in_flight.append((day, asyncio.create_task(fetch_day(day))))
+                while in_flight:
+                    day, fetch_task = in_flight.popleft()
+                    try:
+                        invoices = await fetch_task
+                    except Exception as e:
+                        invoices = e
+                    await fetched_days.put((day, invoices))
+                    for next_day in islice(remaining_days, 1):
+                        in_flight.append((next_day, asyncio.create_task(fetch_day(next_day))))
+                await fetched_days.put(None)
+            finally:
+                for _, fetch_task in in_flight:
+                    fetch_task.cancel()
+        
+        # Insert in multi-day batches - one insert_records transaction per batch instead of per day
         daily_results = []
+        batch_invoices = []
+        batch_days = []
         
-        while current_date <= end_date:
+        async def insert_batch():
+            """Insert the accumulated invoices; a failure is attributed to every day in the batch."""
+            batch_dates = f"{batch_days[0].date} to {batch_days[-1].date}"
             try:
-                logger.info(f"📅 Processing {current_date} for {shop_name}...")
+                line_items_created = await asyncio.to_thread(db_manager.insert_records, batch_invoices)
+                results['total_line_items'] += line_items_created
+                logger.info(f"   💾 [{shop_id}] {batch_dates}: {len(batch_invoices)} invoices → {line_items_created} line items")
+            except Exception as e:
+                error_msg = f"Failed to process invoices for {batch_dates}: {str(e)}"
+                logger.error(f"   ❌ {error_msg}")
+                results['errors'].append(error_msg)
+                for day_result in batch_days:
+                    day_result.success = False
+                    day_result.error = str(e)
+            batch_invoices.clear()
+            batch_days.clear()
+        
+        async def consume():
+            """Record each fetched day and insert its invoices in batches."""
+            while True:
+                fetched_day = await fetched_days.get()
+                if fetched_day is None:
+                    break
+                current_date, invoices = fetched_day
                 
-                # Fetch invoices for this date
-                target_datetime = datetime.combine(current_date, datetime.min.time())
-                invoices = client.fetch_invoices_for_date(target_datetime)
+                if isinstance(invoices, Exception):
+                    error_msg = f"Failed to process {current_date} for {shop_name}: {str(invoices)}"
+                    logger.error(f"   ❌ {error_msg}")
+                    results['errors'].append(error_msg)
+                    daily_results.append(DayResult(current_date, success=False, error=str(invoices)))
+                    continue
                 
-                day_result = {
-                    'date': current_date,
-                    'invoice_count': len(invoices) if invoices else 0,
-                    'line_items_created': 0,
-                    'success': True,
-                    'error': None
-                }
+                day_result = DayResult(current_date, invoice_count=len(invoices) if invoices else 0)
+                daily_results.append(day_result)
+                results['days_processed'] += 1
                 
                 if invoices:
-                    logger.info(f"   📊 Found {len(invoices)} invoices for {current_date}")
+                    # Invoices already carry their _target_date, so merged batches keep per-day attribution
+                    logger.info(f"   📊 [{shop_id}] Found {len(invoices)} invoices for {current_date}")
                     results['days_with_data'] += 1
-                    
-                    # Process invoices using the correct DatabaseManager method
-                    try:
-                        # Insert and process all invoices for this date
-                        line_items_created = db_manager.insert_records(invoices)
-                        logger.info(f"   💾 Successfully processed {len(invoices)} invoices → {line_items_created} line items")
-                        
-                    except Exception as e:
-                        error_msg = f"Failed to process invoices for {current_date}: {str(e)}"
-                        logger.error(f"   ❌ {error_msg}")
-                        results['errors'].append(error_msg)
-                        line_items_created = 0
-                    
-                    day_result['line_items_created'] = line_items_created
                     results['total_invoices'] += len(invoices)
-                    results['total_line_items'] += line_items_created
-                    
-                    logger.info(f"   ✅ {current_date}: {len(invoices)} invoices → {line_items_created} line items")
-                else:
-                    logger.info(f"   📭 No invoices found for {current_date}")
-                
-                daily_results.append(day_result)
-                results['days_processed'] += 1
+                    batch_invoices.extend(invoices)
+                    batch_days.append(day_result)
                 
-            except Exception as e:
-                error_msg = f"Failed to process {current_date} for {shop_name}: {str(e)}"
-                logger.error(f"   ❌ {error_msg}")
-                results['errors'].append(error_msg)
-                
-                day_result = {
-                    'date': current_date,
-                    'invoice_count': 0,
-                    'line_items_created': 0,
-                    'success': False,
-                    'error': str(e)
-                }
-                daily_results.append(day_result)
+                    if len(batch_days) >= INSERT_BATCH_DAYS:
+                        await insert_batch()
+                else:
+                    logger.info(f"   📭 [{shop_id}] No invoices found for {current_date}")
             
-            # Move to next day
-            current_date += timedelta(days=1)
+            if batch_days:
+                await insert_batch()
+        
+        await asyncio.gather(produce(), consume())
         
         # Close database connection
         db_manager.close()
@@ -156,12 +220,14 @@ async def ingest_shop_data(shop_id: str, shop_name: str, start_date: date, end_d
         results['daily_results'] = daily_results
         results['success'] = len(results['errors']) == 0
         
-        # Log summary for this shop
-        logger.info(f"🎉 {shop_name} ({shop_id}) Summary:")
-        logger.info(f"   📊 Total invoices: {results['total_invoices']:,}")
-        logger.info(f"   📋 Total line items: {results['total_line_items']:,}")
-        logger.info(f"   📅 Days with data: {results['days_with_data']}/{results['total_days']}")
-        logger.info(f"   ❌ Errors: {len(results['errors'])}")
+        # Log summary for this shop (one record, so concurrent shops don't interleave it)
+        logger.info("\n".join([
+            f"🎉 {shop_name} ({shop_id}) Summary:",
+            f"   📊 Total invoices: {results['total_invoices']:,}",
+            f"   📋 Total line items: {results['total_line_items']:,}",
+            f"   📅 Days with data: {results['days_with_data']}/{results['total_days']}",
+            f"   ❌ Errors: {len(results['errors'])}",
+        ]))
         
         return results
         
@@ -203,68 +269,68 @@ async def main():
         
         logger.info(f"🏪 Found {len(available_shops)} shops to process")
         
-        # Process each shop
-        all_results = []
-        overall_success = True
+        # Process shops concurrently - the work is dominated by API and database latency
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SHOPS)
         
-        for shop_id, shop_config in available_shops.items():
-            print(f"\n{'='*20} {shop_config.shop_name} ({shop_id}) {'='*20}")
-            
-            shop_results = await ingest_shop_data(
-                shop_id, 
-                shop_config.shop_name, 
-                start_date, 
-                end_date
-            )
-            
-            all_results.append(shop_results)
-            
-            if not shop_results['success']:
-                overall_success = False
-            
-            # Brief pause between shops
-            await asyncio.sleep(2)
+        # All shops write to the same database, so share one thread-safe pool instead of
+        # opening (and TLS-handshaking) a separate pool per shop. A DatabaseManager borrows
+        # one connection at a time (insert_records returns its connection before the metrics
+        # queries borrow theirs), so with the semaphore capping running shops the pool never
+        # runs dry - psycopg2 pools raise PoolError instead of waiting when exhausted.
+        pool_config = await asyncio.to_thread(Config, next(iter(available_shops)))
+        connection_pool = await asyncio.to_thread(
+            create_shared_connection_pool, pool_config, MAX_CONCURRENT_SHOPS
+        )
         
-        # Print final summary
-        print(f"\n{'='*60}")
-        print("🎉 FEBRUARY 2025 INGESTION COMPLETE")
-        print("=" * 60)
+        async def run_shop(shop_id: str, shop_name: str) -> Dict[str, Any]:
+            async with semaphore:
+                logger.info(f"{'='*20} {shop_name} ({shop_id}) {'='*20}")
+                return await ingest_shop_data(shop_id, shop_name, start_date, end_date, connection_pool)
         
-        total_invoices = 0
-        total_line_items = 0
-        total_errors = 0
+        # ingest_shop_data reports failures in its results instead of raising;
+        # gather keeps the results in shop order for the summary
+        try:
+            all_results = await asyncio.gather(*[
+                run_shop(shop_id, shop_config.shop_name)
+                for shop_id, shop_config in available_shops.items()
+            ])
+        finally:
+            connection_pool.closeall()
+        overall_success = all(result['success'] for result in all_results)
         
+        # Build the final summary once and emit it as a single log record
+        # (setup_logging already echoes to stdout)
+        total_invoices = sum(result['total_invoices'] for result in all_results)
+        total_line_items = sum(result['total_line_items'] for result in all_results)
+        total_errors = sum(len(result['errors']) for result in all_results)
+        success_count = sum(1 for result in all_results if result['success'])
+        
+        summary = ["=" * 60, "🎉 FEBRUARY 2025 INGESTION COMPLETE", "=" * 60]
         for result in all_results:
             status = "✅" if result['success'] else "❌"
-            print(f"{status} {result['shop_name']} ({result['shop_id']}):")
-            print(f"   📊 Invoices: {result['total_invoices']:,}")
-            print(f"   📋 Line Items: {result['total_line_items']:,}")
-            print(f"   📅 Days with data: {result['days_with_data']}/{result['total_days']}")
-            print(f"   ❌ Errors: {len(result['errors'])}")
-            
-            total_invoices += result['total_invoices']
-            total_line_items += result['total_line_items']
-            total_errors += len(result['errors'])
-            print()
-        
-        print("📊 OVERALL SUMMARY:")
-        print(f"   🏪 Shops processed: {len(all_results)}")
-        print(f"   📊 Total invoices: {total_invoices:,}")
-        print(f"   📋 Total line items: {total_line_items:,}")
-        print(f"   ❌ Total errors: {total_errors}")
-        print(f"   ⏱️  Duration: {datetime.now() - start_time}")
-        
-        success_count = sum(1 for r in all_results if r['success'])
-        print(f"   🎯 Success rate: {success_count}/{len(all_results)} shops")
-        
-        logger.info("🎉 February 2025 multi-shop ingestion completed")
-        logger.info(f"📊 Final totals: {total_invoices:,} invoices, {total_line_items:,} line items")
+            summary += [
+                f"{status} {result['shop_name']} ({result['shop_id']}):",
+                f"   📊 Invoices: {result['total_invoices']:,}",
+                f"   📋 Line Items: {result['total_line_items']:,}",
+                f"   📅 Days with data: {result['days_with_data']}/{result['total_days']}",
+                f"   ❌ Errors: {len(result['errors'])}",
+                "",
+            ]
+        summary += [
+            "📊 OVERALL SUMMARY:",
+            f"   🏪 Shops processed: {len(all_results)}",
+            f"   📊 Total invoices: {total_invoices:,}",
+            f"   📋 Total line items: {total_line_items:,}",
+            f"   ❌ Total errors: {total_errors}",
+            f"   ⏱️  Duration: {datetime.now() - start_time}",
+            f"   🎯 Success rate: {success_count}/{len(all_results)} shops",
+        ]
+        logger.info("\n".join(summary))
         
         return overall_success
         
     except Exception as e:
         logger.error(f"💥 Critical error in main ingestion: {str(e)}")
-        print(f"💥 Critical error: {str(e)}")
         return False
 
 if __name__ == "__main__":
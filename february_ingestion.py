@@ -8,7 +8,11 @@ and processes it into the line_items table.
 
 import os
 import sys
+import time
+import queue
+import atexit
 import logging
+import logging.handlers
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any
 
@@ -19,29 +23,34 @@ from config import Config
 from fullbay_client import FullbayClient
 from database import DatabaseManager
 
-# Set up logging
+# Set up logging - records are queued and written by a background listener thread,
+# so console and file I/O stay off the ingestion loop
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_handlers = [logging.StreamHandler(), logging.FileHandler('february_ingestion.log')]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Flush queued records on exit
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('february_ingestion.log')
-    ]
+    format='%(message)s',  # Timestamps are added by the listener's handlers
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Pause after a day with data before the next API call, to be respectful to the API
+API_PAUSE_SECONDS = 2
+
 def generate_february_dates() -> List[datetime]:
     """Generate all dates in February 2025."""
-    dates = []
     start_date = datetime(2025, 2, 1, tzinfo=timezone.utc)
     end_date = datetime(2025, 2, 28, tzinfo=timezone.utc)
     
-    current_date = start_date
-    while current_date <= end_date:
-        dates.append(current_date)
-        current_date += timedelta(days=1)
-    
-    return dates
+    return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
 
 def process_february_data():
     """Process February 2025 data day by day."""
@@ -72,6 +81,7 @@ def process_february_data():
         total_line_items = 0
         successful_days = 0
         failed_days = 0
+        resume_at = 0.0
         
         # Process each day
         for i, date in enumerate(february_dates, 1):
@@ -79,6 +89,12 @@ def process_february_data():
             logger.info(f"\n📅 Processing day {i}/{len(february_dates)}: {date_str}")
             
             try:
+                # Time spent inserting the previous day counts towards the pause
+                remaining_pause = resume_at - time.monotonic()
+                if remaining_pause > 0:
+                    time.sleep(remaining_pause)
+                resume_at = 0.0
+                
                 # Fetch invoices for this date
                 logger.info(f"🔍 Fetching invoices for {date_str}...")
                 logger.info(f"⏳ This may take up to 1000 seconds (16+ minutes) - please be patient...")
@@ -89,6 +105,7 @@ def process_february_data():
                     continue
                 
                 logger.info(f"📊 Found {len(invoices)} invoices for {date_str}")
+                resume_at = time.monotonic() + API_PAUSE_SECONDS
                 
                 # Insert raw data and process into line items
                 logger.info(f"💾 Inserting and processing data for {date_str}...")
@@ -100,24 +117,23 @@ def process_february_data():
                 total_line_items += records_inserted
                 successful_days += 1
                 
-                # Small delay to be respectful to the API
-                import time
-                time.sleep(2)  # Increased delay to be more respectful
-                
             except Exception as e:
                 logger.error(f"❌ Failed to process {date_str}: {e}")
                 failed_days += 1
                 continue
         
-        # Final summary
-        logger.info("\n" + "="*60)
-        logger.info("🎉 FEBRUARY 2025 INGESTION COMPLETED")
-        logger.info("="*60)
-        logger.info(f"✅ Successful days: {successful_days}")
-        logger.info(f"❌ Failed days: {failed_days}")
-        logger.info(f"📊 Total invoices processed: {total_invoices:,}")
-        logger.info(f"📊 Total line items created: {total_line_items:,}")
-        logger.info("="*60)
+        # Final summary, emitted as a single log record
+        logger.info("\n".join([
+            "",
+            "="*60,
+            "🎉 FEBRUARY 2025 INGESTION COMPLETED",
+            "="*60,
+            f"✅ Successful days: {successful_days}",
+            f"❌ Failed days: {failed_days}",
+            f"📊 Total invoices processed: {total_invoices:,}",
+            f"📊 Total line items created: {total_line_items:,}",
+            "="*60,
+        ]))
         
         # Verify final state
         with db_manager._get_connection() as conn:
@@ -152,11 +168,12 @@ def main():
     print("🚀 February 2025 Fullbay Data Ingestion")
     print("="*50)
     
-    # Check if user wants to proceed
-    response = input("This will pull February 2025 data day by day. Continue? (y/n): ")
-    if response.lower() != 'y':
-        print("❌ Operation cancelled")
-        return
+    # Check if user wants to proceed (skipped for unattended runs: AUTO_YES set or no terminal)
+    if not os.getenv("AUTO_YES") and sys.stdin.isatty():
+        response = input("This will pull February 2025 data day by day. Continue? (y/n): ")
+        if response.lower() != 'y':
+            print("❌ Operation cancelled")
+            return
     
     success = process_february_data()
     
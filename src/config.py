@@ -7,11 +7,41 @@ and provides centralized configuration access.
 
 import os
 import json
+import time
 import boto3
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from botocore.exceptions import ClientError
 
 
+# How long a fetched secret is reused; short enough that warm Lambdas pick up a rotated password
+SECRETS_CACHE_TTL_SECONDS = 300
+
+# (secret name, region) -> (monotonic time fetched, secret string)
+_secret_cache: Dict[Tuple[str, str], Tuple[float, str]] = {}
+
+
+def _fetch_secret_string(secret_name: str, region: str) -> str:
+    """
+    Fetch a secret from AWS Secrets Manager, reusing it for SECRETS_CACHE_TTL_SECONDS.
+    
+    Every shop's Config (and every warm Lambda invocation within the TTL) shares one
+    lookup; failed lookups are not cached.
+    """
+    cached = _secret_cache.get((secret_name, region))
+    if cached and time.monotonic() - cached[0] < SECRETS_CACHE_TTL_SECONDS:
+        return cached[1]
+    
+    secrets_client = boto3.client("secretsmanager", region_name=region)
+    response = secrets_client.get_secret_value(SecretId=secret_name)
+    _secret_cache[(secret_name, region)] = (time.monotonic(), response["SecretString"])
+    return response["SecretString"]
+
+
+def clear_secrets_cache():
+    """Forget cached secrets, e.g. after credentials were rejected because they were rotated."""
+    _secret_cache.clear()
+
+
 class Config:
     """
     Configuration manager that loads settings from environment variables
@@ -42,6 +72,10 @@ class Config:
         self.db_port = int(os.getenv("DB_PORT", "5432"))
         self.db_name = os.getenv("DB_NAME", "fullbay_data")
         self.db_user = os.getenv("DB_USER")
+        self.db_ssl_mode = os.getenv("DB_SSL_MODE", "require")
+        # Set to "off" for bulk backfills: commits stop waiting on the WAL flush
+        # (a crash can lose the last few transactions, but never corrupts data)
+        self.db_synchronous_commit = os.getenv("DB_SYNCHRONOUS_COMMIT", "on")
         
         # AWS Secrets
         self.secrets_manager_secret_name = os.getenv("SECRETS_MANAGER_SECRET_NAME")
@@ -66,9 +100,7 @@ class Config:
             return {}
             
         try:
-            secrets_client = boto3.client("secretsmanager", region_name=self.aws_region)
-            response = secrets_client.get_secret_value(SecretId=self.secrets_manager_secret_name)
-            return json.loads(response["SecretString"])
+            return json.loads(_fetch_secret_string(self.secrets_manager_secret_name, self.aws_region))
         except ClientError as e:
             if self.environment == "development":
                 # In development, allow running without secrets manager
@@ -9,7 +9,7 @@ import json
 import logging
 import psycopg2
 import psycopg2.extras
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import AbstractConnectionPool, SimpleConnectionPool, ThreadedConnectionPool
 from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
@@ -19,21 +19,78 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# TCP keepalives so long-running loads notice a dropped RDS connection instead of hanging
+DB_KEEPALIVE_SETTINGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+}
+
+# Rows per multi-row INSERT statement when writing line items
+LINE_ITEM_PAGE_SIZE = 1000
+
+
+def connection_kwargs(config: Config) -> Dict[str, Any]:
+    """
+    psycopg2 connection parameters shared by every pool and script.
+    
+    Only the db_* fields of config are read, so maintenance scripts can pass a
+    plain namespace of database settings instead of a full Config.
+    
+    Args:
+        config: Configuration object containing database connection details
+        
+    Returns:
+        Keyword arguments for psycopg2.connect or a connection pool
+    """
+    return {
+        "host": config.db_host,
+        "port": config.db_port,
+        "database": config.db_name,
+        "user": config.db_user,
+        "password": config.db_password,
+        "sslmode": config.db_ssl_mode,
+        "application_name": "fullbay-api-ingestion",
+        "cursor_factory": psycopg2.extras.RealDictCursor,
+        **DB_KEEPALIVE_SETTINGS,
+    }
+
+
+def create_shared_connection_pool(config: Config, max_connections: int) -> ThreadedConnectionPool:
+    """
+    Create a thread-safe connection pool that several DatabaseManagers can share.
+    
+    Lets concurrently ingested shops reuse a handful of connections instead of each
+    opening its own pool. The caller owns the pool and must call closeall() on it.
+    
+    Args:
+        config: Configuration object containing database connection details
+        max_connections: Maximum number of open connections
+        
+    Returns:
+        Connection pool to pass to DatabaseManager
+    """
+    return ThreadedConnectionPool(1, max_connections, **connection_kwargs(config))
+
 
 class DatabaseManager:
     """
     Manager for database operations including connection handling and data persistence.
     """
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, connection_pool: Optional[AbstractConnectionPool] = None):
         """
         Initialize database manager.
         
         Args:
             config: Configuration object containing database connection details
+            connection_pool: Optional shared pool (see create_shared_connection_pool);
+                by default connect() creates a pool owned by this manager
         """
         self.config = config
-        self.connection_pool: Optional[SimpleConnectionPool] = None
+        self.connection_pool: Optional[AbstractConnectionPool] = connection_pool
+        self._owns_pool = connection_pool is None
         self.connection = None
         
         # Table configuration
@@ -63,16 +120,12 @@ class DatabaseManager:
         try:
             logger.info("Connecting to database...")
             
-            # Create connection pool for better resource management
-            self.connection_pool = SimpleConnectionPool(
-                1, 5,  # min and max connections
-                host=self.config.db_host,
-                port=self.config.db_port,
-                database=self.config.db_name,
-                user=self.config.db_user,
-                password=self.config.db_password,
-                cursor_factory=psycopg2.extras.RealDictCursor
-            )
+            # Create connection pool for better resource management (unless one is shared)
+            if self._owns_pool:
+                self.connection_pool = SimpleConnectionPool(
+                    1, 5,  # min and max connections
+                    **connection_kwargs(self.config)
+                )
             
             # Test connection (tables must already exist)
             with self._get_connection() as conn:
@@ -332,6 +385,7 @@ class DatabaseManager:
         
         total_line_items_created = 0
         raw_records_stored = 0
+        raw_data_ids = []
         
         processing_start_time = datetime.now(timezone.utc)
         errors_count = 0
@@ -341,11 +395,18 @@ class DatabaseManager:
                 with conn.cursor() as cursor:
                     logger.info(f"Processing {len(records)} invoice records...")
                     
+                    # The whole batch is one transaction with a single COMMIT; optionally
+                    # let that COMMIT skip waiting for the WAL flush as well
+                    if self.config.db_synchronous_commit != 'on':
+                        cursor.execute("SELECT set_config('synchronous_commit', %s, true)",
+                                       (self.config.db_synchronous_commit,))
+                    
                     for record in records:
                         try:
                             # Step 1: Store raw JSON data
                             raw_data_id = self._store_raw_data(cursor, record)
                             raw_records_stored += 1
+                            raw_data_ids.append(raw_data_id)
                             
                             # Step 2: Flatten invoice into line items
                             line_items = self._flatten_invoice_to_line_items(record, raw_data_id)
@@ -375,15 +436,17 @@ class DatabaseManager:
                     conn.commit()
                     logger.info(f"Successfully processed {raw_records_stored} invoices, "
                               f"created {total_line_items_created} line items")
-                    
-                    # Send monitoring metrics
-                    self.send_ingestion_summary_metrics(
-                        processing_start_time, 
-                        raw_records_stored, 
-                        total_line_items_created,
-                        errors_count
-                    )
-                    
+            
+            # Send monitoring metrics - after the connection above is back in the pool, since
+            # the metrics queries borrow their own (keeps a manager to one connection at a time)
+            self.send_ingestion_summary_metrics(
+                processing_start_time, 
+                raw_records_stored, 
+                total_line_items_created,
+                errors_count,
+                raw_data_ids
+            )
+            
         except Exception as e:
             logger.error(f"Batch processing failed: {e}")
             raise Exception(f"Failed to process records: {e}")
@@ -422,7 +485,7 @@ class DatabaseManager:
         cursor.execute(insert_sql, (fullbay_invoice_id, json.dumps(record), False))
         raw_data_id = cursor.fetchone()['id']
         
-        logger.debug(f"Stored raw data for invoice {fullbay_invoice_id}, ID: {raw_data_id}")
+        logger.debug("Stored raw data for invoice %s, ID: %s", fullbay_invoice_id, raw_data_id)
         return raw_data_id
     
     def _flatten_invoice_to_line_items(self, record: Dict[str, Any], raw_data_id: int) -> List[Dict[str, Any]]:
@@ -765,7 +828,7 @@ class DatabaseManager:
                     
                     line_items.append(line_item)
         
-        logger.debug(f"Created {len(line_items)} part line items for correction {context.get('fullbay_correction_id')}")
+        logger.debug("Created %d part line items for correction %s", len(line_items), context.get('fullbay_correction_id'))
         return line_items
     
     def _process_labor(self, correction: Dict[str, Any], complaint: Dict[str, Any], context: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -834,7 +897,7 @@ class DatabaseManager:
                 })
                 line_items.append(line_item)
         
-        logger.debug(f"Created {len(line_items)} labor line items for correction {context.get('fullbay_correction_id')}")
+        logger.debug("Created %d labor line items for correction %s", len(line_items), context.get('fullbay_correction_id'))
         return line_items
     
     def _validate_service_description_total(self, correction: Dict[str, Any], parts_line_items: List[Dict[str, Any]], labor_line_items: List[Dict[str, Any]]) -> None:
@@ -882,8 +945,8 @@ class DatabaseManager:
                                f"Original: {original_total}, Calculated: {calculated_total}, "
                                f"No line items to adjust")
         else:
-            logger.debug(f"Total validation passed for correction {correction.get('primaryKey')}: "
-                        f"Original: {original_total}, Calculated: {calculated_total}")
+            logger.debug("Total validation passed for correction %s: Original: %s, Calculated: %s",
+                         correction.get('primaryKey'), original_total, calculated_total)
     
     def _create_shop_supplies_line_item(self, invoice_context: Dict[str, Any], raw_data_id: int) -> Dict[str, Any]:
         """
@@ -1192,7 +1255,9 @@ class DatabaseManager:
                         unit_cost, unit_price, line_total, price_overridden,
                         taxable, tax_rate, line_tax, sales_total, inventory_item, core_type, sublet,
             ingestion_timestamp, ingestion_source
-                 )         VALUES (
+                 ) VALUES %s
+        """
+        values_template = """(
              %(raw_data_id)s, %(fullbay_invoice_id)s, %(invoice_number)s, %(invoice_date)s, %(due_date)s,
              %(shop_title)s, %(shop_email)s, %(shop_address)s,
              %(customer_id)s, %(customer)s, %(customer_external_id)s, %(customer_main_phone)s,
@@ -1213,22 +1278,36 @@ class DatabaseManager:
                         %(unit_cost)s, %(unit_price)s, %(line_total)s, %(price_overridden)s,
                         %(taxable)s, %(tax_rate)s, %(line_tax)s, %(sales_total)s, %(inventory_item)s, %(core_type)s, %(sublet)s,
             CURRENT_TIMESTAMP, 'fullbay_api'
-        )
-        """
+        )"""
         
         try:
-            for line_item in line_items:
-                try:
-                    # Ensure all required fields have values (None for missing fields)
-                    processed_item = self._prepare_line_item_for_insertion(line_item)
-                    
-                    cursor.execute(insert_sql, processed_item)
-                    inserted_count += 1
-                    
-                except Exception as item_error:
-                    logger.warning(f"Failed to insert line item {line_item.get('line_item_type', 'unknown')} "
-                                 f"for invoice {line_item.get('fullbay_invoice_id', 'unknown')}: {item_error}")
-                    continue
+            # Ensure all required fields have values (None for missing fields)
+            processed_items = [self._prepare_line_item_for_insertion(line_item) for line_item in line_items]
+            
+            # Fast path: all of the invoice's line items in multi-row INSERTs
+            cursor.execute("SAVEPOINT line_items_batch")
+            try:
+                psycopg2.extras.execute_values(cursor, insert_sql, processed_items,
+                                               template=values_template, page_size=LINE_ITEM_PAGE_SIZE)
+                inserted_count = len(processed_items)
+            except psycopg2.Error as batch_error:
+                # A bad row fails the whole statement - retry row by row so only that row is skipped
+                cursor.execute("ROLLBACK TO SAVEPOINT line_items_batch")
+                logger.warning(f"Batch line item insert failed, retrying row by row: {batch_error}")
+                
+                for line_item, processed_item in zip(line_items, processed_items):
+                    cursor.execute("SAVEPOINT line_item_row")
+                    try:
+                        psycopg2.extras.execute_values(cursor, insert_sql, [processed_item],
+                                                       template=values_template)
+                        inserted_count += 1
+                    except psycopg2.Error as item_error:
+                        cursor.execute("ROLLBACK TO SAVEPOINT line_item_row")
+                        logger.warning(f"Failed to insert line item {line_item.get('line_item_type', 'unknown')} "
+                                     f"for invoice {line_item.get('fullbay_invoice_id', 'unknown')}: {item_error}")
+                        continue
+                    cursor.execute("RELEASE SAVEPOINT line_item_row")
+            cursor.execute("RELEASE SAVEPOINT line_items_batch")
             
             logger.info(f"Successfully inserted {inserted_count} line items")
             return inserted_count
@@ -1511,8 +1590,8 @@ class DatabaseManager:
             logger.error(f"Failed to log execution metadata: {e}")
     
     def close(self):
-        """Close database connection pool."""
-        if self.connection_pool:
+        """Close database connection pool (a shared pool is left to its owner)."""
+        if self.connection_pool and self._owns_pool:
             self.connection_pool.closeall()
             logger.info("Database connection pool closed")
     
@@ -1945,7 +2024,8 @@ class DatabaseManager:
             return {'error': str(e)}
     
     def send_ingestion_summary_metrics(self, processing_start_time: datetime, records_processed: int, 
-                                     line_items_created: int, errors_count: int = 0):
+                                     line_items_created: int, errors_count: int = 0,
+                                     raw_data_ids: Optional[List[int]] = None):
         """
         Send summary metrics after an ingestion run.
         
@@ -1954,6 +2034,7 @@ class DatabaseManager:
             records_processed: Number of records processed
             line_items_created: Number of line items created
             errors_count: Number of errors encountered
+            raw_data_ids: Raw data IDs stored by this run; the invoice total covers only their line items
         """
         try:
             # Calculate processing duration
@@ -1962,18 +2043,21 @@ class DatabaseManager:
             # Get data quality metrics
             quality_metrics = self.calculate_data_quality_metrics()
             
-            # Get financial total from recent ingestion
+            # Get financial total from this run's invoices only - other shops may be ingesting
+            # concurrently, and re-ingested invoices keep their older line items
             total_value = 0
             try:
-                with self._get_connection() as conn:
-                    with conn.cursor() as cursor:
-                        cursor.execute("""
-                            SELECT SUM(line_total) as total
-                            FROM fullbay_line_items
-                            WHERE ingestion_timestamp >= %s
-                        """, (processing_start_time,))
-                        result = cursor.fetchone()
-                        total_value = float(result['total'] or 0)
+                if raw_data_ids:
+                    with self._get_connection() as conn:
+                        with conn.cursor() as cursor:
+                            cursor.execute(f"""
+                                SELECT SUM(line_total) as total
+                                FROM {self.line_items_table}
+                                WHERE raw_data_id = ANY(%s)
+                                  AND ingestion_timestamp >= %s
+                            """, (raw_data_ids, processing_start_time))
+                            result = cursor.fetchone()
+                            total_value = float(result['total'] or 0)
             except:
                 pass
             
@@ -8,6 +8,7 @@ Implements proper token generation and error handling for the Fullbay invoice en
 import logging
 import time
 import hashlib
+import ipaddress
 import requests
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any, Optional
@@ -35,6 +36,7 @@ class FullbayClient:
         self.api_key = config.fullbay_api_key
         self.base_url = "https://app.fullbay.com/services"
         self.session = self._create_session()
+        self._public_ip: Optional[str] = None
         
         if not self.api_key:
             raise ValueError("Fullbay API key is required")
@@ -89,9 +91,9 @@ class FullbayClient:
             token_data = f"{self.api_key}{today_date}{ip_address}"
             token = hashlib.sha1(token_data.encode()).hexdigest()
             
-            logger.debug(f"Generated token for today {today_date} with IP {ip_address}")
-            logger.debug(f"Token data: {self.api_key}{today_date}{ip_address}")
-            logger.debug(f"Token: {token}")
+            logger.debug("Generated token for today %s with IP %s", today_date, ip_address)
+            logger.debug("Token data: %s%s%s", self.api_key, today_date, ip_address)
+            logger.debug("Token: %s", token)
             
             return token
             
@@ -103,12 +105,20 @@ class FullbayClient:
         """
         Get public IP address for API requests.
         
+        The address is looked up once per client; every day's token needs it.
+        Only a response that parses as an IP address is cached.
+        
         Returns:
             Public IP address
         """
+        if self._public_ip:
+            return self._public_ip
         try:
             response = requests.get("https://api.ipify.org", timeout=5)
-            return response.text
+            response.raise_for_status()
+            # An error page would otherwise be hashed into every token for the client's lifetime
+            self._public_ip = str(ipaddress.ip_address(response.text.strip()))
+            return self._public_ip
         except Exception as e:
             logger.warning(f"Failed to get public IP: {e}")
             return "unknown"
@@ -149,7 +159,7 @@ class FullbayClient:
             # Make API request
             url = f"{self.base_url}/getInvoices.php"
             logger.info(f"Making request to: {url}")
-            logger.debug(f"Request parameters: {params}")
+            logger.debug("Request parameters: %s", params)
             
             start_time = time.time()
             response = self.session.get(url, params=params, timeout=1000)
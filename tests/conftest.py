@@ -7,6 +7,8 @@ import pytest
 from unittest.mock import patch
 import logging
 
+from src.config import clear_secrets_cache
+
 # Disable logging during tests to reduce noise
 logging.disable(logging.CRITICAL)
 
@@ -28,6 +30,9 @@ def clean_environment():
         if var in os.environ:
             del os.environ[var]
     
+    # Don't let a secret fetched (and mocked) in one test leak into the next
+    clear_secrets_cache()
+    
     yield
     
     # Restore original environment
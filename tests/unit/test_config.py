@@ -5,7 +5,7 @@ Unit tests for configuration management.
 import os
 import pytest
 from unittest.mock import patch, MagicMock
-from src.config import Config
+from src.config import Config, SECRETS_CACHE_TTL_SECONDS
 
 
 class TestConfig:
@@ -26,6 +26,7 @@ class TestConfig:
             assert config.db_user == "test-user"
             assert config.db_port == 5432
             assert config.db_name == "fullbay_data"
+            assert config.db_synchronous_commit == "on"
     
     def test_config_with_environment_variables(self):
         """Test config with custom environment variables."""
@@ -83,6 +84,50 @@ class TestConfig:
             assert config.db_password == "secret-pass"
             mock_client.get_secret_value.assert_called_once_with(SecretId="test-secret")
     
+    @patch('boto3.client')
+    def test_secrets_fetched_once_per_process(self, mock_boto_client):
+        """Test that multiple configs (e.g. one per shop) share one Secrets Manager lookup."""
+        mock_client = MagicMock()
+        mock_client.get_secret_value.return_value = {
+            "SecretString": '{"fullbay_api_key": "secret-key", "db_password": "secret-pass"}'
+        }
+        mock_boto_client.return_value = mock_client
+        
+        with patch.dict(os.environ, {
+            "DB_HOST": "test-host",
+            "DB_USER": "test-user",
+            "SECRETS_MANAGER_SECRET_NAME": "test-secret",
+            "ENVIRONMENT": "production"
+        }, clear=True):
+            first = Config(shop_id="DET")
+            second = Config(shop_id="OKPK")
+            
+            assert first.db_password == second.db_password == "secret-pass"
+            mock_client.get_secret_value.assert_called_once_with(SecretId="test-secret")
+    
+    @patch('src.config.time.monotonic')
+    @patch('boto3.client')
+    def test_secrets_refetched_after_ttl(self, mock_boto_client, mock_monotonic):
+        """Test that a cached secret expires so a rotated password is picked up."""
+        mock_client = MagicMock()
+        mock_client.get_secret_value.side_effect = [
+            {"SecretString": '{"fullbay_api_key": "secret-key", "db_password": "old-pass"}'},
+            {"SecretString": '{"fullbay_api_key": "secret-key", "db_password": "new-pass"}'},
+        ]
+        mock_boto_client.return_value = mock_client
+        # Fetched at t=0, next lookup just after the TTL, then stored again
+        mock_monotonic.side_effect = [0, SECRETS_CACHE_TTL_SECONDS + 1, SECRETS_CACHE_TTL_SECONDS + 1]
+        
+        with patch.dict(os.environ, {
+            "DB_HOST": "test-host",
+            "DB_USER": "test-user",
+            "SECRETS_MANAGER_SECRET_NAME": "test-secret",
+            "ENVIRONMENT": "production"
+        }, clear=True):
+            assert Config().db_password == "old-pass"
+            assert Config().db_password == "new-pass"
+            assert mock_client.get_secret_value.call_count == 2
+    
     def test_db_connection_string(self):
         """Test database connection string generation."""
         with patch.dict(os.environ, {
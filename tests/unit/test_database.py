@@ -3,7 +3,8 @@ Unit tests for database operations.
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import psycopg2
+from unittest.mock import Mock, patch, MagicMock, call
 from datetime import datetime, timezone
 
 from src.database import DatabaseManager
@@ -22,6 +23,8 @@ class TestDatabaseManager:
         config.db_name = "test_db"
         config.db_user = "test_user"
         config.db_password = "test_pass"
+        config.db_ssl_mode = "require"
+        config.db_synchronous_commit = "on"
         return config
     
     @pytest.fixture
@@ -233,4 +236,116 @@ class TestDatabaseManager:
         
         result = db_manager.test_connection()
         
-        assert result is False
\ No newline at end of file
+        assert result is False
+    
+    def test_shared_pool_is_not_created_or_closed(self, mock_config):
+        """Test that managers sharing a pool neither replace nor close it."""
+        shared_pool = MagicMock()
+        mock_cursor = shared_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = {'version': 'PostgreSQL 15.4'}
+        mock_cursor.fetchall.return_value = [
+            {'table_name': name} for name in ('fullbay_raw_data', 'fullbay_line_items', 'ingestion_metadata')
+        ]
+        managers = [DatabaseManager(mock_config, connection_pool=shared_pool) for _ in range(2)]
+        
+        with patch('src.database.SimpleConnectionPool') as mock_pool_class:
+            for manager in managers:
+                manager.connect()
+                assert manager.connection_pool is shared_pool
+            mock_pool_class.assert_not_called()
+        
+        for manager in managers:
+            manager.close()
+        shared_pool.closeall.assert_not_called()
+    
+    def test_insert_records_uses_one_shared_connection_at_a_time(self, mock_config):
+        """Test that insert_records returns its connection before the metrics queries borrow theirs."""
+        checked_out = []
+        peak = [0]
+        
+        def getconn():
+            conn = MagicMock()
+            conn.cursor.return_value.__enter__.return_value.fetchone.return_value = {'id': 1, 'total': 0}
+            checked_out.append(conn)
+            peak[0] = max(peak[0], len(checked_out))
+            return conn
+        
+        shared_pool = MagicMock()
+        shared_pool.getconn.side_effect = getconn
+        shared_pool.putconn.side_effect = checked_out.remove
+        
+        for _ in range(2):
+            manager = DatabaseManager(mock_config, connection_pool=shared_pool)
+            with patch.object(manager, '_flatten_invoice_to_line_items', return_value=[]), \
+                 patch.object(manager, 'send_cloudwatch_metrics'):
+                manager.insert_records([{"primaryKey": "INV-1"}])
+        
+        assert peak[0] == 1
+        assert checked_out == []
+    
+    def test_summary_metrics_total_covers_only_this_run(self, db_manager):
+        """Test that the invoice total is filtered to the raw data IDs this run stored."""
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = {'total': 125.5}
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        started = datetime.now(timezone.utc)
+        
+        with patch.object(db_manager, '_get_connection') as mock_get_connection, \
+             patch.object(db_manager, 'calculate_data_quality_metrics', return_value={}), \
+             patch.object(db_manager, 'send_cloudwatch_metrics') as mock_send:
+            mock_get_connection.return_value.__enter__.return_value = mock_conn
+            db_manager.send_ingestion_summary_metrics(started, 2, 5, 0, [7, 8])
+        
+        sql, params = mock_cursor.execute.call_args.args
+        assert "raw_data_id = ANY(%s)" in sql
+        assert params == ([7, 8], started)
+        assert mock_send.call_args.args[0]['total_invoice_value'] == 125.5
+    
+    @patch('psycopg2.extras.execute_values')
+    def test_insert_line_items_batch_success(self, mock_execute_values, db_manager):
+        """Test that a clean batch goes out as one execute_values call under a savepoint."""
+        mock_cursor = MagicMock()
+        line_items = [{"fullbay_invoice_id": "INV-1", "line_item_type": "PART"} for _ in range(3)]
+        
+        result = db_manager._insert_line_items(mock_cursor, line_items)
+        
+        assert result == 3
+        mock_execute_values.assert_called_once()
+        assert len(mock_execute_values.call_args.args[2]) == 3
+        assert mock_cursor.execute.call_args_list == [
+            call("SAVEPOINT line_items_batch"),
+            call("RELEASE SAVEPOINT line_items_batch"),
+        ]
+    
+    @patch('psycopg2.extras.execute_values')
+    def test_insert_line_items_skips_only_bad_row(self, mock_execute_values, db_manager):
+        """Test that a failed batch rolls back to its savepoint and retries row by row."""
+        mock_cursor = MagicMock()
+        line_items = [
+            {"fullbay_invoice_id": "INV-1", "line_item_type": "PART", "part_description": description}
+            for description in ("good-1", "bad", "good-2")
+        ]
+        
+        def execute_values(cursor, sql, rows, **kwargs):
+            if any(row["part_description"] == "bad" for row in rows):
+                raise psycopg2.DataError("value too long")
+        
+        mock_execute_values.side_effect = execute_values
+        
+        result = db_manager._insert_line_items(mock_cursor, line_items)
+        
+        assert result == 2
+        # One batch attempt, then one attempt per row
+        assert mock_execute_values.call_count == 4
+        assert mock_cursor.execute.call_args_list == [
+            call("SAVEPOINT line_items_batch"),
+            call("ROLLBACK TO SAVEPOINT line_items_batch"),
+            call("SAVEPOINT line_item_row"),
+            call("RELEASE SAVEPOINT line_item_row"),
+            call("SAVEPOINT line_item_row"),
+            call("ROLLBACK TO SAVEPOINT line_item_row"),
+            call("SAVEPOINT line_item_row"),
+            call("RELEASE SAVEPOINT line_item_row"),
+            call("RELEASE SAVEPOINT line_items_batch"),
+        ]
@@ -7,10 +7,15 @@ Safely updates the database schema and clears tables for fresh data processing
 import os
 import sys
 import psycopg2
-import psycopg2.extras
 from datetime import datetime
+from types import SimpleNamespace
 import json
 
+# Add src to path for the database module
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from database import connection_kwargs
+
 # Load environment variables from local config file if it exists
 def load_local_env():
     """Load environment variables from local_config.env if it exists."""
@@ -45,14 +50,17 @@ load_local_env()
 def get_database_connection():
     """Get database connection using environment variables."""
     try:
-        conn = psycopg2.connect(
-            host=os.getenv('DB_HOST'),
-            port=int(os.getenv('DB_PORT', '5432')),
-            database=os.getenv('DB_NAME', 'fullbay_data'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            cursor_factory=psycopg2.extras.RealDictCursor
+        # Only the DB_* settings - a maintenance script shouldn't need API credentials -
+        # with the same SSL, keepalive and cursor settings as the ingestion pools
+        db_settings = SimpleNamespace(
+            db_host=os.getenv('DB_HOST'),
+            db_port=int(os.getenv('DB_PORT', '5432')),
+            db_name=os.getenv('DB_NAME', 'fullbay_data'),
+            db_user=os.getenv('DB_USER'),
+            db_password=os.getenv('DB_PASSWORD'),
+            db_ssl_mode=os.getenv('DB_SSL_MODE', 'require')
         )
+        conn = psycopg2.connect(**connection_kwargs(db_settings))
         return conn
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
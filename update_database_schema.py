@@ -56,7 +56,7 @@ def update_database_schema():
             cursor.execute("""
                 SELECT COUNT(*) as column_count
                 FROM information_schema.columns 
-                WHERE table_name = 'fullbay_line_items'
+                WHERE table_name = 'fullbay_line_items' AND table_schema = 'public'
             """)
             
             result = cursor.fetchone()